@@ -0,0 +1,36 @@
+# agents/_google_clients.py
+
+import functools
+from google.cloud import speech_v1
+from google.cloud import storage
+from google.cloud import texttospeech_v1
+from google.cloud import translate_v2 as translate
+
+# Shared Google API clients. Every client opens its own channel with a TLS
+# handshake, so agents that each built their own paid that cost repeatedly.
+# The clients are documented thread-safe, so one instance per process is
+# enough; lru_cache makes construction lazy and idempotent.
+
+
+@functools.lru_cache(maxsize=1)
+def get_speech_client() -> speech_v1.SpeechClient:
+    """Return the process-wide Speech-to-Text client"""
+    return speech_v1.SpeechClient()
+
+
+@functools.lru_cache(maxsize=1)
+def get_tts_client() -> texttospeech_v1.TextToSpeechClient:
+    """Return the process-wide Text-to-Speech client"""
+    return texttospeech_v1.TextToSpeechClient()
+
+
+@functools.lru_cache(maxsize=1)
+def get_translate_client() -> translate.Client:
+    """Return the process-wide Translate client"""
+    return translate.Client()
+
+
+@functools.lru_cache(maxsize=1)
+def get_storage_client() -> storage.Client:
+    """Return the process-wide Cloud Storage client"""
+    return storage.Client()
@@ -1,104 +1,386 @@
 from google.cloud import speech_v1
 from google.cloud import texttospeech_v1
-from google.cloud import translate_v2 as translate
+import atexit
+import concurrent.futures
+import hashlib
+import itertools
 import os
-from typing import Dict, Optional
+import shutil
+import threading
+from collections import OrderedDict, namedtuple
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
 import tempfile
+from agents._google_clients import (get_speech_client, get_storage_client,
+                                    get_translate_client, get_tts_client)
+
+class Lang(IntEnum):
+    """Supported languages, usable as indices into the config tables"""
+    ENGLISH = 0
+    HINDI = 1
+    TAMIL = 2
+    TELUGU = 3
+    MALAYALAM = 4
+
+LangCfg = namedtuple('LangCfg', 'code name voice_name translate_code')
+
+# Frozen per-language configuration, indexed by Lang - a single tuple
+# index replaces the nested dict lookups in the request path
+_LANG_TABLE = (
+    LangCfg('en-IN', 'English', 'en-IN-Standard-A', 'en'),
+    LangCfg('hi-IN', 'Hindi', 'hi-IN-Standard-A', 'hi'),
+    LangCfg('ta-IN', 'Tamil', 'ta-IN-Standard-A', 'ta'),
+    LangCfg('te-IN', 'Telugu', 'te-IN-Standard-A', 'te'),
+    LangCfg('ml-IN', 'Malayalam', 'ml-IN-Standard-A', 'ml'),
+    # Add more Indian languages as needed
+)
+
+_NAME_TO_LANG = {lang.name.lower(): lang for lang in Lang}
 
 class GoogleAudioAgent:
-    def __init__(self, credentials_path: Optional[str] = None):
+    # Maximum number of cached translations kept in memory
+    TRANSLATE_CACHE_SIZE = 2048
+
+    # Files below this size go through a single recognize RTT; larger ones
+    # are streamed so upload overlaps with server-side decoding
+    STREAMING_THRESHOLD = 64 * 1024
+    STREAMING_CHUNK_SIZE = 16 * 1024
+
+    # Number of rotating TTS output files kept on disk
+    TTS_FILE_POOL_SIZE = 128
+
+    # Number of transcoded FLAC files kept around for repeat uploads
+    FLAC_CACHE_SIZE = 64
+
+    # Files above this size are uploaded once to GCS and transcribed by
+    # reference instead of being re-sent inline (which also hits the
+    # 60-second inline limit)
+    GCS_THRESHOLD = 10 * 1024 * 1024
+
+    def __init__(self, credentials_path: Optional[str] = None,
+                 gcs_bucket: Optional[str] = None):
         if credentials_path:
             os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-            
-        self.speech_client = speech_v1.SpeechClient()
-        self.tts_client = texttospeech_v1.TextToSpeechClient()
-        self.translate_client = translate.Client()
-        
-        # Language configurations for Indian languages
+
+        # Optional staging bucket for long audio; configurable through the
+        # GCS_STT_BUCKET environment variable since callers up the stack
+        # construct this agent with defaults. When unset, large files fall
+        # back to the streaming path
+        self.gcs_bucket = gcs_bucket or os.getenv('GCS_STT_BUCKET')
+
+        # Shared per-process clients - avoids a fresh gRPC channel and TLS
+        # handshake for every agent instantiation
+        self.speech_client = get_speech_client()
+        self.tts_client = get_tts_client()
+        self.translate_client = get_translate_client()
+
+        # LRU cache for translate results - repeat FAQ transcripts are common
+        # and each translate call is a paid network round trip. Locked so
+        # concurrent requests can't race the lookup/evict sequences
+        self._translate_cache = OrderedDict()
+        self._translate_lock = threading.Lock()
+
+        # Dict view of the language table, kept for external callers that
+        # still iterate language_configs
         self.language_configs = {
-            'malayalam': {
-                'code': 'ml-IN',
-                'name': 'Malayalam',
-                'voice_name': 'ml-IN-Standard-A',
-                'translate_code': 'ml'
-            },
-            'hindi': {
-                'code': 'hi-IN',
-                'name': 'Hindi',
-                'voice_name': 'hi-IN-Standard-A',
-                'translate_code': 'hi'
-            },
-            'tamil': {
-                'code': 'ta-IN',
-                'name': 'Tamil',
-                'voice_name': 'ta-IN-Standard-A',
-                'translate_code': 'ta'
-            },
-            'telugu': {
-                'code': 'te-IN',
-                'name': 'Telugu',
-                'voice_name': 'te-IN-Standard-A',
-                'translate_code': 'te'
-            },
-            'english': {
-                'code': 'en-IN',
-                'name': 'English',
-                'voice_name': 'en-IN-Standard-A',
-                'translate_code': 'en'
-            }
-            # Add more Indian languages as needed
+            lang.name.lower(): {
+                'code': cfg.code,
+                'name': cfg.name,
+                'voice_name': cfg.voice_name,
+                'translate_code': cfg.translate_code
+            } for lang, cfg in zip(Lang, _LANG_TABLE)
         }
 
-    def speech_to_text(self, audio_data: str, source_language: str) -> Dict:
-        """Convert speech to text using Google Speech-to-Text"""
+        # Pre-build one frozen RecognitionConfig per language - protobuf
+        # construction and validation is per-request work we can do once.
+        # Indexed by Lang so the hot-path lookup is a tuple index.
+        self._recognition_configs = tuple(
+            speech_v1.RecognitionConfig(
+                language_code=cfg.code,
+                enable_automatic_punctuation=True,
+                model='command_and_search',
+                use_enhanced=True
+            ) for cfg in _LANG_TABLE
+        )
+
+        # Pre-build the TTS protobuf configs once - voice parameters never
+        # change per request, so rebuilding them per call is wasted work
+        self._voice_cache = tuple(
+            texttospeech_v1.VoiceSelectionParams(
+                language_code=cfg.code,
+                name=cfg.voice_name
+            ) for cfg in _LANG_TABLE
+        )
+        self._audio_config = texttospeech_v1.AudioConfig(
+            audio_encoding=texttospeech_v1.AudioEncoding.MP3,
+            speaking_rate=0.9,  # Slightly slower for clarity
+            pitch=0.0
+        )
+
+        # Thread pool for pipelining multiple synthesize_speech calls
+        self._tts_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+        # Bounded pool of rotating TTS output files - one mkstemp per call
+        # leaks orphaned tmp files under sustained load
+        self._tts_tmp_dir = tempfile.mkdtemp(prefix='tts_')
+        self._tts_counter = itertools.count()
+        atexit.register(shutil.rmtree, self._tts_tmp_dir, ignore_errors=True)
+
+        # FLAC transcode cache keyed by (inode, mtime) so re-uploads of the
+        # same file skip the transcode, plus per-sample-rate FLAC configs.
+        # Each entry owns its output file (named after the key), and the
+        # file is deleted when its entry is evicted
+        self._flac_tmp_dir = tempfile.mkdtemp(prefix='stt_flac_')
+        self._flac_cache = OrderedDict()
+        self._flac_lock = threading.Lock()
+        self._flac_configs = {}
+        atexit.register(shutil.rmtree, self._flac_tmp_dir, ignore_errors=True)
+
+    def _translate_cached(self, text: str, source_code: str, target_code: str) -> str:
+        """Translate text, serving repeat requests from an in-memory LRU cache"""
+        # Hash the text so long answers don't blow up the key size
+        digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        cache_key = f"{digest}|{source_code}|{target_code}"
+
+        with self._translate_lock:
+            cached = self._translate_cache.get(cache_key)
+            if cached is not None:
+                self._translate_cache.move_to_end(cache_key)
+                return cached
+
+        # Network call runs outside the lock
+        translation = self.translate_client.translate(
+            text,
+            source_language=source_code,
+            target_language=target_code
+        )
+        translated_text = translation['translatedText']
+
+        with self._translate_lock:
+            self._translate_cache[cache_key] = translated_text
+            if len(self._translate_cache) > self.TRANSLATE_CACHE_SIZE:
+                self._translate_cache.popitem(last=False)
+
+        return translated_text
+
+    def _streaming_requests(self, audio_path: str):
+        """Yield StreamingRecognizeRequest chunks read from disk"""
+        with open(audio_path, 'rb') as audio:
+            while True:
+                chunk = audio.read(self.STREAMING_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield speech_v1.StreamingRecognizeRequest(audio_content=chunk)
+
+    def _memory_requests(self, content: bytes):
+        """Yield StreamingRecognizeRequest chunks sliced from a bytes buffer"""
+        for start in range(0, len(content), self.STREAMING_CHUNK_SIZE):
+            yield speech_v1.StreamingRecognizeRequest(
+                audio_content=content[start:start + self.STREAMING_CHUNK_SIZE]
+            )
+
+    def _streaming_recognize(self, requests, config) -> tuple:
+        """Transcribe via streaming_recognize, overlapping upload and decode"""
+        streaming_config = speech_v1.StreamingRecognitionConfig(
+            config=config,
+            interim_results=False,
+            single_utterance=True
+        )
+
+        text = None
+        confidence = 0.0
+        responses = self.speech_client.streaming_recognize(
+            streaming_config,
+            requests
+        )
+        for response in responses:
+            for result in response.results:
+                if result.is_final and result.alternatives:
+                    text = result.alternatives[0].transcript
+                    confidence = result.alternatives[0].confidence
+
+        return text, confidence
+
+    def _to_flac(self, audio_path: str) -> tuple:
+        """Transcode audio to FLAC, returning (path, sample_rate)
+
+        FLAC is lossless at roughly half the bytes of PCM, which directly
+        halves the upload component of STT latency. Results are cached by
+        (inode, mtime) so repeat uploads of the same file skip the work.
+        """
+        import soundfile as sf
+
+        if audio_path.endswith('.flac'):
+            return audio_path, sf.info(audio_path).samplerate
+
+        stat = os.stat(audio_path)
+        cache_key = (stat.st_ino, stat.st_mtime_ns)
+        with self._flac_lock:
+            cached = self._flac_cache.get(cache_key)
+            if cached:
+                self._flac_cache.move_to_end(cache_key)
+                return cached
+
+        # Transcode outside the lock - only the cache updates are guarded.
+        # The output file is named after the cache key, so a live entry's
+        # file can never be overwritten by a later transcode
+        data, sample_rate = sf.read(audio_path)
+        flac_path = os.path.join(
+            self._flac_tmp_dir,
+            f'stt_{stat.st_ino:x}_{stat.st_mtime_ns:x}.flac'
+        )
+        sf.write(flac_path, data, sample_rate, format='FLAC', subtype='PCM_16')
+
+        with self._flac_lock:
+            self._flac_cache[cache_key] = (flac_path, sample_rate)
+            evicted = None
+            if len(self._flac_cache) > self.FLAC_CACHE_SIZE:
+                _, evicted = self._flac_cache.popitem(last=False)
+
+        # Delete the evicted entry's file with it - disk usage stays
+        # bounded by the cache size without slot reuse
+        if evicted is not None:
+            try:
+                os.remove(evicted[0])
+            except OSError:
+                pass
+
+        return flac_path, sample_rate
+
+    def _flac_config(self, lang: 'Lang', sample_rate: int):
+        """Return a FLAC RecognitionConfig for this language and sample rate"""
+        key = (lang, sample_rate)
+        config = self._flac_configs.get(key)
+        if config is None:
+            config = speech_v1.RecognitionConfig(
+                encoding=speech_v1.RecognitionConfig.AudioEncoding.FLAC,
+                sample_rate_hertz=sample_rate,
+                language_code=_LANG_TABLE[lang].code,
+                enable_automatic_punctuation=True,
+                model='command_and_search',
+                use_enhanced=True
+            )
+            self._flac_configs[key] = config
+        return config
+
+    def _gcs_recognize(self, audio_path: str, config) -> tuple:
+        """Upload once to GCS and transcribe by URI via long_running_recognize
+
+        Avoids pushing the whole file through RAM and the inline request,
+        and lifts the 60-second inline audio limit. The staged blob only
+        exists for the duration of the transcription.
+        """
+        blob_name = f"stt_{os.path.basename(audio_path)}"
+        blob = get_storage_client().bucket(self.gcs_bucket).blob(blob_name)
+        blob.upload_from_filename(audio_path, chunk_size=8 << 20)
+
+        try:
+            audio = speech_v1.RecognitionAudio(uri=f"gs://{self.gcs_bucket}/{blob_name}")
+            operation = self.speech_client.long_running_recognize(config=config, audio=audio)
+            response = operation.result(timeout=600)
+        finally:
+            # Never leave staged audio behind in the bucket
+            try:
+                blob.delete()
+            except Exception as e:
+                print(f"Error deleting staged GCS blob: {str(e)}")
+
+        if not response.results:
+            return None, 0.0
+
+        # Long audio comes back in segments - stitch the transcripts
+        text = " ".join(
+            result.alternatives[0].transcript
+            for result in response.results if result.alternatives
+        ).strip()
+        confidence = response.results[0].alternatives[0].confidence
+        return text or None, confidence
+
+    def _recognize_inline(self, content: bytes, config) -> tuple:
+        """Transcribe audio bytes in a single recognize round trip"""
+        audio = speech_v1.RecognitionAudio(content=content)
+        response = self.speech_client.recognize(config=config, audio=audio)
+
+        if not response.results:
+            return None, 0.0
+        return (response.results[0].alternatives[0].transcript,
+                response.results[0].alternatives[0].confidence)
+
+    def speech_to_text(self, audio_data, source_language: str) -> Dict:
+        """Convert speech to text using Google Speech-to-Text
+
+        Accepts a file path or an in-memory file-like object (anything
+        with read()), so callers can pass encoded audio without a
+        round trip through disk.
+        """
         try:
             # Get language configuration
-            lang_config = self.language_configs.get(source_language)
-            if not lang_config:
+            lang = _NAME_TO_LANG.get(source_language)
+            if lang is None:
                 return {
                     "success": False,
                     "error": f"Unsupported language: {source_language}"
                 }
+            lang_config = _LANG_TABLE[lang]
 
-            # Read the audio file
-            with open(audio_data, 'rb') as audio:
-                content = audio.read()
-
-            # Configure audio and recognition
-            audio = speech_v1.RecognitionAudio(content=content)
-            config = speech_v1.RecognitionConfig(
-                language_code=lang_config['code'],
-                enable_automatic_punctuation=True,
-                # model='command_and_search',
-                model=lang_config.get('model', 'command_and_search'),
-                use_enhanced=True
-                  # Allow language-specific models
-                # audio_channel_count=2,  # For stereo audio (can adjust dynamically)
-                # enable_word_time_offsets=True,  # Provides timestamps for each word
-                # enable_word_confidence=True 
-            )
+            if hasattr(audio_data, 'read'):
+                # In-memory audio: already encoded (WAV/FLAC headers carry
+                # the format), so send the bytes straight through
+                content = audio_data.read()
+                config = self._recognition_configs[lang]
+                if len(content) >= self.STREAMING_THRESHOLD:
+                    text, confidence = self._streaming_recognize(
+                        self._memory_requests(content), config
+                    )
+                else:
+                    text, confidence = self._recognize_inline(content, config)
+            else:
+                # Transcode to FLAC so the upload is roughly half the size;
+                # fall back to the original bytes if the codec is unsupported
+                try:
+                    audio_data, sample_rate = self._to_flac(audio_data)
+                    config = self._flac_config(lang, sample_rate)
+                except Exception as e:
+                    print(f"FLAC transcode failed, sending original audio: {str(e)}")
+                    # Configs are prebuilt per language in __init__
+                    config = self._recognition_configs[lang]
 
-            # Perform the transcription
-            response = self.speech_client.recognize(config=config, audio=audio)
+                # Stream large files so transcription starts before the upload
+                # finishes; small files are cheaper as a single recognize RTT
+                file_size = os.path.getsize(audio_data)
+                if self.gcs_bucket and file_size > self.GCS_THRESHOLD:
+                    text, confidence = self._gcs_recognize(audio_data, config)
+                elif file_size >= self.STREAMING_THRESHOLD:
+                    text, confidence = self._streaming_recognize(
+                        self._streaming_requests(audio_data), config
+                    )
+                else:
+                    # Read in one pre-sized gulp with a large buffer so the
+                    # ingest doesn't degrade into many small read() syscalls
+                    with open(audio_data, 'rb', buffering=1 << 20) as audio:
+                        content = audio.read(file_size)
+                    text, confidence = self._recognize_inline(content, config)
 
-            if not response.results:
+            if not text:
                 return {
                     "success": False,
                     "error": "No speech detected"
                 }
 
-            # Get transcribed text
-            text = response.results[0].alternatives[0].transcript
-            confidence = response.results[0].alternatives[0].confidence
-
             # If source is not English, translate to English
             if source_language != 'english':
-                translation = self.translate_client.translate(
-                    text,
-                    source_language=lang_config['translate_code'],
-                    target_language='en'
-                )
-                english_text = translation['translatedText']
+                # Mixed-language transcripts often come back effectively in
+                # English already - skip the translate round trip for those
+                ascii_frac = sum(1 for c in text if ord(c) < 128) / max(len(text), 1)
+                if ascii_frac > 0.95 or len(text) < 3:
+                    print("Transcript is mostly ASCII, skipping translation")
+                    english_text = text
+                else:
+                    english_text = self._translate_cached(
+                        text,
+                        lang_config.translate_code,
+                        'en'
+                    )
             else:
                 english_text = text
 
@@ -117,44 +399,57 @@ class GoogleAudioAgent:
                 "error": str(e)
             }
 
-    def text_to_speech(self, text: str, language: str) -> Dict:
-        """Convert text to speech using Google Text-to-Speech"""
+    def text_to_speech_bytes(self, text: str, language: str) -> Dict:
+        """Convert text to speech, returning MP3 bytes without touching disk"""
         try:
             # Get language configuration
-            lang_config = self.language_configs.get(language)
-            if not lang_config:
+            lang = _NAME_TO_LANG.get(language)
+            if lang is None:
                 return {
                     "success": False,
                     "error": f"Unsupported language: {language}"
                 }
 
-            # Set the voice
-            voice = texttospeech_v1.VoiceSelectionParams(
-                language_code=lang_config['code'],
-                name=lang_config['voice_name']
-            )
-
-            # Set the audio config
-            audio_config = texttospeech_v1.AudioConfig(
-                audio_encoding=texttospeech_v1.AudioEncoding.MP3,
-                speaking_rate=0.9,  # Slightly slower for clarity
-                pitch=0.0
-            )
-
-            # Set the synthesis input
+            # Set the synthesis input - voice and audio config are prebuilt
             synthesis_input = texttospeech_v1.SynthesisInput(text=text)
 
             # Generate the audio
             response = self.tts_client.synthesize_speech(
                 input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config
+                voice=self._voice_cache[lang],
+                audio_config=self._audio_config
             )
 
-            # Create temporary audio file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as output:
-                output.write(response.audio_content)
-                output_path = output.name
+            return {
+                "success": True,
+                "audio_bytes": response.audio_content,
+                "mime": "audio/mp3",
+                "language": language
+            }
+
+        except Exception as e:
+            print(f"Text-to-speech error: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def text_to_speech(self, text: str, language: str) -> Dict:
+        """Convert text to speech using Google Text-to-Speech"""
+        result = self.text_to_speech_bytes(text, language)
+        if not result["success"]:
+            return result
+
+        try:
+            # Rotate through a bounded set of output files so disk usage
+            # stays capped and no per-call tmp file allocation is needed
+            slot = next(self._tts_counter) % self.TTS_FILE_POOL_SIZE
+            output_path = os.path.join(self._tts_tmp_dir, f'tts_{slot:03d}.mp3')
+            fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+            try:
+                os.write(fd, result["audio_bytes"])
+            finally:
+                os.close(fd)
 
             return {
                 "success": True,
@@ -169,6 +464,18 @@ class GoogleAudioAgent:
                 "error": str(e)
             }
 
+    def text_to_speech_batch(self, items: List[Tuple[str, str]]) -> List[Dict]:
+        """Synthesize several (text, language) pairs concurrently
+
+        Each synthesize_speech call is an independent network round trip,
+        so N-way synthesis completes in roughly max(single) instead of sum.
+        """
+        futures = [
+            self._tts_pool.submit(self.text_to_speech, text, language)
+            for text, language in items
+        ]
+        return [future.result() for future in futures]
+
     def process_audio_query(self, audio_data: tuple, source_language: str) -> Dict:
         """Process audio from Gradio (returns tuple of (path, sampling_rate))"""
         try:
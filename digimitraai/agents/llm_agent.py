@@ -1,54 +1,119 @@
 # agents/llm_agent.py
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict
 from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.memory import ConversationBufferMemory
+from langchain.memory import ConversationBufferWindowMemory
 from utils.domain_checker import DomainChecker
 
 class LLMAgent:
+    # Answer cache bounds - identical normalized queries skip OpenAI entirely
+    ANSWER_CACHE_SIZE = 4096
+    ANSWER_CACHE_TTL = 3600  # seconds
+
+    # The prompt never varies, so keep it as a constant string and build the
+    # message list per call - no template parsing or Runnable plumbing needed
+    _SYSTEM_PROMPT = (
+        "You are an expert Aadhaar customer service assistant. "
+        "You can ONLY answer questions related to Aadhaar and its services. "
+        "If the question is not related to Aadhaar, politely inform that you "
+        "can only assist with Aadhaar-related queries."
+    )
+
+    # Shared DomainChecker - it is stateless, so one per process is enough
+    _DOMAIN_CHECKER = None
+
+    @classmethod
+    def _get_domain_checker(cls) -> DomainChecker:
+        if cls._DOMAIN_CHECKER is None:
+            cls._DOMAIN_CHECKER = DomainChecker()
+        return cls._DOMAIN_CHECKER
+
     def __init__(self, model_name: str = "gpt-3.5-turbo"):
         self.llm = ChatOpenAI(model_name=model_name)
-        self.memory = ConversationBufferMemory(return_messages=True)
-        
-        self.domain_checker = DomainChecker()
-        
-        self.prompt = ChatPromptTemplate.from_template("""
-            You are an expert Aadhaar customer service assistant. You can ONLY answer questions related to Aadhaar and its services.
-            If the question is not related to Aadhaar, politely inform that you can only assist with Aadhaar-related queries.
-            
-            Question: {question}
-            
-            Assistant: Let me help you with your query about Aadhaar.
-            First, let me check if this is related to Aadhaar services.
-        """)
-        
-        self.chain = self.prompt | self.llm
+        # Windowed memory keeps the last few turns only, so long-running
+        # sessions stay constant in RAM and prompt-token cost
+        self.memory = ConversationBufferWindowMemory(k=6, return_messages=True)
+
+        # LRU+TTL cache of query -> response so duplicate questions
+        # (very common in chat sessions) don't hit OpenAI again. The lock
+        # keeps the get/expire/evict sequences atomic across concurrent
+        # requests sharing this agent
+        self._answer_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self.domain_checker = self._get_domain_checker()
+
+    @staticmethod
+    def _cache_key(query: str) -> bytes:
+        """Build a compact cache key from a whitespace/case-normalized query"""
+        normalized = " ".join(query.lower().split())
+        return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+    def _cache_get(self, key: bytes):
+        """Return a cached response if present and not expired"""
+        with self._cache_lock:
+            entry = self._answer_cache.get(key)
+            if entry is None:
+                return None
+            timestamp, response = entry
+            if time.time() - timestamp > self.ANSWER_CACHE_TTL:
+                del self._answer_cache[key]
+                return None
+            self._answer_cache.move_to_end(key)
+            return response
+
+    def _cache_put(self, key: bytes, response: Dict):
+        """Store a response, evicting the oldest entry when full"""
+        with self._cache_lock:
+            self._answer_cache[key] = (time.time(), response)
+            if len(self._answer_cache) > self.ANSWER_CACHE_SIZE:
+                self._answer_cache.popitem(last=False)
 
     def process_query(self, query: str) -> Dict:
         try:
             # Check domain relevance
             is_relevant, relevance_score = self.domain_checker.is_domain_relevant(query)
-            
+
             if not is_relevant:
                 return {
                     "answer": "I apologize, but I can only assist with questions related to Aadhaar and its services. Your question appears to be about something else. Please feel free to ask any Aadhaar-related questions.",
                     "confidence": 1.0,
                     "source": "Domain Check"
                 }
-            
-            # Process relevant query
-            response = self.chain.invoke({"question": query})
-            
-            return {
+
+            # Serve duplicate queries from the cache without an OpenAI call
+            cache_key = self._cache_key(query)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                print("Serving LLM answer from cache")
+                return dict(cached)
+
+            # Process relevant query - plain message list, no template render
+            response = self.llm.invoke([
+                ("system", self._SYSTEM_PROMPT),
+                ("human", query),
+            ])
+
+            result = {
                 "answer": response.content,
                 "source": "LLM-generated response",
                 "confidence": 0.8 * relevance_score  # Adjust confidence based on relevance
             }
+            self._cache_put(cache_key, result)
+            return dict(result)
         except Exception as e:
             print(f"Error in LLM processing: {str(e)}")
             raise
 
     def clear_memory(self):
         """Clear conversation memory"""
-        self.memory.clear()
\ No newline at end of file
+        self.memory.clear()
+
+    def clear_cache(self):
+        """Clear the answer cache (e.g. after a knowledge base update)"""
+        with self._cache_lock:
+            self._answer_cache.clear()
\ No newline at end of file
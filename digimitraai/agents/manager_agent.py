@@ -1,4 +1,8 @@
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, Optional, List
 from dotenv import load_dotenv
 from pathlib import Path
@@ -11,27 +15,63 @@ import json
 from agents.multilingual_agent import MultilingualAgent
 
 class ManagerAgent:
-    def __init__(self, 
+    # Answer cache bounds - identical normalized queries skip RAG/LLM entirely
+    ANSWER_CACHE_SIZE = 4096
+    ANSWER_CACHE_TTL = 3600  # seconds
+
+    def __init__(self,
              rag_confidence_threshold: float = 0.75,
              audio_confidence_threshold: float = 0.7,
              vector_store_path: str = "data/vector_store"):
         # Load environment variables
         self._load_environment()
-    
-        
+
+
         # Initialize agents
         self.rag_agent = RAGAgent(vector_store_path=vector_store_path)
         self.llm_agent = LLMAgent()
         self.audio_agent = AudioAgent()
         self.multilingual_agent = MultilingualAgent()
         self.google_audio_agent = GoogleAudioAgent()
-        
+
         # Set confidence thresholds
         self.rag_confidence_threshold = rag_confidence_threshold
         self.audio_confidence_threshold = audio_confidence_threshold
-        
+
+        # LRU+TTL cache of normalized query -> final response, checked
+        # before dispatching to the RAG/LLM agents at all. The lock keeps
+        # the get/expire/evict sequences atomic across concurrent requests
+        self._answer_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         print("All agents initialized successfully")
 
+    @staticmethod
+    def _cache_key(query: str) -> bytes:
+        """Build a compact cache key from a whitespace/case-normalized query"""
+        normalized = " ".join(query.lower().split())
+        return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+    def _cache_get(self, key: bytes):
+        """Return a cached response if present and not expired"""
+        with self._cache_lock:
+            entry = self._answer_cache.get(key)
+            if entry is None:
+                return None
+            timestamp, response = entry
+            if time.time() - timestamp > self.ANSWER_CACHE_TTL:
+                del self._answer_cache[key]
+                return None
+            self._answer_cache.move_to_end(key)
+            return response
+
+    def _cache_put(self, key: bytes, response: Dict):
+        """Store a response, evicting the oldest entry when full"""
+        with self._cache_lock:
+            self._answer_cache[key] = (time.time(), response)
+            if len(self._answer_cache) > self.ANSWER_CACHE_SIZE:
+                self._answer_cache.popitem(last=False)
+
     def _load_environment(self):
         """Load environment variables"""
         try:
@@ -61,11 +101,21 @@ class ManagerAgent:
                     return audio_result
                 query = audio_result["text"]
 
+            # Serve duplicate queries from the cache without touching the agents
+            cache_key = self._cache_key(query)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                print("Serving answer from cache")
+                return {**cached, "text": query}
+
             # Clear previous memory
             self.rag_agent.clear_memory()
             self.llm_agent.clear_memory()
 
-            # Process with RAG
+            # The LLM is only consulted after RAG classifies the query -
+            # speculating on it in parallel would pay a full, discarded
+            # completion on every exact-match or high-confidence RAG hit,
+            # since an already-running future cannot be cancelled
             print(f"\nProcessing query: {query}")
             try:
                 rag_response = self.rag_agent.process_query(query)
@@ -83,28 +133,32 @@ class ManagerAgent:
                 # Case 1: Very high confidence RAG response
                 if confidence >= self.rag_confidence_threshold and semantic_match >= 0.85:
                     print("Using RAG response (high confidence)")
+                    self._cache_put(cache_key, rag_response)
                     return {**rag_response, "text": query}
-                
+
                 # Case 2: Exact match
                 if rag_response.get("exact_match", False):
                     print("Using RAG response (exact match)")
+                    self._cache_put(cache_key, rag_response)
                     return {**rag_response, "text": query}
-                
+
                 # Case 3: Domain relevant query
                 if domain_relevant:
                     print("Domain relevant query, processing...")
-                    
+
                     # Get LLM response
                     llm_response = self.llm_agent.process_query(query)
-                    
+
                     # Combine responses only if RAG has moderately relevant info
                     if has_sources and semantic_match >= 0.6:
                         print("Combining RAG and LLM responses")
                         combined = self._combine_responses(rag_response, llm_response)
+                        self._cache_put(cache_key, combined)
                         return {**combined, "text": query}
-                    
+
                     # Use LLM response for domain-relevant queries without good matches
                     print("Using LLM response for domain-relevant query")
+                    self._cache_put(cache_key, llm_response)
                     return {**llm_response, "text": query}
                 
                 # Case 4: Not domain relevant
@@ -197,6 +251,9 @@ class ManagerAgent:
                 
             # Initialize vector store from JSON
             self.rag_agent.initialize_vector_store()
+            with self._cache_lock:
+                self._answer_cache.clear()
+            self.llm_agent.clear_cache()
             print("Knowledge base initialized successfully")
         except Exception as e:
             print(f"Error initializing knowledge base: {str(e)}")
@@ -209,6 +266,10 @@ class ManagerAgent:
             print("Updating knowledge base from JSON...")
             # Re-initialize vector store with latest JSON data
             self.rag_agent.initialize_vector_store()
+            # Cached answers may be stale once the knowledge base changes
+            with self._cache_lock:
+                self._answer_cache.clear()
+            self.llm_agent.clear_cache()
             print("Knowledge base updated successfully")
         except Exception as e:
             print(f"Error updating knowledge base: {str(e)}")
@@ -225,6 +286,21 @@ class ManagerAgent:
             print(f"Source Language: {source_language}")
             print(f"Target Language: {target_language}")
 
+            # Track translate round trips avoided by the caches/skips below
+            cache_hits_before = self.multilingual_agent.translate_cache_hits
+
+            # English in, English out needs no translation machinery at all
+            if query and source_language == 'english' and target_language == 'english':
+                response = self.process_query(query)
+                response.update({
+                    "original_query": query,
+                    "english_query": query,
+                    "source_language": source_language,
+                    "target_language": target_language,
+                    "round_trips_saved": 0
+                })
+                return response
+
             # Process audio if provided
             if audio_data:
                 print(f"\nProcessing audio in {source_language}...")
@@ -257,17 +333,11 @@ class ManagerAgent:
                     query = translation["text"]
                     print(f"Translated query to English: {query}")
 
-            # Process query in English
+            # Process query in English through the main dispatch path, so
+            # the multilingual flow shares its caching, parallel RAG/LLM
+            # calls and response combining instead of a weaker duplicate
             print(f"\nProcessing English query: {query}")
-            try:
-                rag_response = self.rag_agent.process_query(query)
-                if rag_response["confidence"] >= self.rag_confidence_threshold:
-                    response = rag_response
-                else:
-                    response = self.llm_agent.process_query(query)
-            except Exception as e:
-                print(f"Error in query processing: {str(e)}")
-                response = self.llm_agent.process_query(query)
+            response = self.process_query(query)
 
             # Translate response if needed
             if target_language != 'english':
@@ -284,7 +354,9 @@ class ManagerAgent:
                 "original_query": original_query,
                 "english_query": query,
                 "source_language": source_language,
-                "target_language": target_language
+                "target_language": target_language,
+                "round_trips_saved": (self.multilingual_agent.translate_cache_hits
+                                      - cache_hits_before)
             })
 
             return response
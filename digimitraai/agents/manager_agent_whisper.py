@@ -30,14 +30,6 @@ class ManagerAgent:
         self.rag_confidence_threshold = rag_confidence_threshold
         self.audio_confidence_threshold = audio_confidence_threshold
 
-            # Update process_multilingual_query method to use google_audio_agent for audio:
-        if audio_file:
-            audio_result = self.google_audio_agent.process_audio_query(
-                audio_file,
-                source_language,
-                target_language
-            )
-        
         print("All agents initialized successfully")
 
     def _load_environment(self):
@@ -1,12 +1,18 @@
 import whisper
-from google.cloud import translate_v2 as translate
+import hashlib
 import tempfile
+import threading
 import os
+from collections import OrderedDict
 from typing import Dict, Optional, List
 import torch
 import gc
+from agents._google_clients import get_translate_client
 
 class MultilingualAgent:
+    # Maximum number of cached translations kept in memory
+    TRANSLATE_CACHE_SIZE = 2048
+
     def __init__(self, google_credentials_path: str = None):
         """Initialize multilingual processing agent"""
         if google_credentials_path:
@@ -61,9 +67,18 @@ class MultilingualAgent:
             print(f"Error loading Whisper model: {str(e)}")
             raise
         
-        # Initialize Google Translate
-        self.translate_client = translate.Client()
-        
+        # Initialize Google Translate (shared per-process client)
+        self.translate_client = get_translate_client()
+
+        # LRU cache for translate results - the same FAQ answers get
+        # re-translated constantly, each one a paid network round trip.
+        # Locked so concurrent requests can't race the lookup/evict steps
+        self._translate_cache = OrderedDict()
+        self._translate_lock = threading.Lock()
+        # Count of translate round trips avoided via the cache
+        self.translate_cache_hits = 0
+
+
         # Define supported languages with Whisper language codes
         self.supported_languages = {
             'malayalam': {
@@ -108,6 +123,34 @@ class MultilingualAgent:
             }
         }
 
+    def _translate_cached(self, text: str, source_code: str, target_code: str) -> str:
+        """Translate text, serving repeat requests from an in-memory LRU cache"""
+        # Hash the text so long answers don't blow up the key size
+        digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        cache_key = f"{digest}|{source_code}|{target_code}"
+
+        with self._translate_lock:
+            cached = self._translate_cache.get(cache_key)
+            if cached is not None:
+                self._translate_cache.move_to_end(cache_key)
+                self.translate_cache_hits += 1
+                return cached
+
+        # Network call runs outside the lock
+        result = self.translate_client.translate(
+            text,
+            source_language=source_code,
+            target_language=target_code
+        )
+        translated_text = result['translatedText']
+
+        with self._translate_lock:
+            self._translate_cache[cache_key] = translated_text
+            if len(self._translate_cache) > self.TRANSLATE_CACHE_SIZE:
+                self._translate_cache.popitem(last=False)
+
+        return translated_text
+
     def _cleanup_memory(self):
         """Force memory cleanup"""
         gc.collect()
@@ -357,15 +400,11 @@ class MultilingualAgent:
             
             source_code = self.supported_languages[source_language]['translate_code']
             target_code = self.supported_languages[target_language]['translate_code']
-            
-            result = self.translate_client.translate(
-                text,
-                source_language=source_code,
-                target_language=target_code
+
+            translated_text = self._post_process_text(
+                self._translate_cached(text, source_code, target_code)
             )
             
-            translated_text = self._post_process_text(result['translatedText'])
-            
             return {
                 "success": True,
                 "text": translated_text,
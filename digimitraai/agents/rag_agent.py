@@ -1,33 +1,136 @@
 from typing import Dict, List
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain.memory import ConversationBufferMemory
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain.memory import ConversationBufferWindowMemory
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain.prompts import PromptTemplate
+from langchain.docstore.document import Document
 from langchain.chains import ConversationalRetrievalChain
+import concurrent.futures
+import itertools
 import os
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 import fitz
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import openai
 from utils.domain_checker import DomainChecker
 
+# Chunking and embedding batch parameters, shared with the PDF workers
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+EMBED_BATCH_SIZE = 100
+
+# Per-match debug payloads are only built when explicitly requested -
+# they bloat every response shipped to the UI and logs otherwise
+DEBUG = os.getenv("RAG_DEBUG", "0").strip().lower() in ("1", "true", "yes")
+
+
+@dataclass(slots=True)
+class ConfidenceResult:
+    """Scoring outcome for one query - slotted, so downstream reads are
+    attribute loads instead of dict lookups"""
+    confidence: float = 0.0
+    domain_relevant: bool = False
+    has_sources: bool = False
+    exact_match: bool = False
+    semantic_match: float = 0.0
+    debug_info: Dict = field(default_factory=dict)
+
+
+def _tokens_to_bitmap(tokens) -> int:
+    """Fold a token set into a 64-bit membership bitmap
+
+    Hashing each token to one of 64 bit positions turns set intersection
+    cardinality into a single popcount of the AND - good enough for the
+    term-overlap ratio heuristic, which never needs exact counts.
+    """
+    bitmap = 0
+    for token in tokens:
+        bitmap |= 1 << (hash(token) & 63)
+    return bitmap
+
+
+def _process_pdf_file(pdf_path: str) -> List[Dict]:
+    """Extract and chunk a single PDF
+
+    Module-level so ProcessPoolExecutor workers can pickle and run it -
+    PyMuPDF extraction is CPU bound and parallelizes across PDFs.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=len,
+    )
+
+    doc = fitz.open(pdf_path)
+
+    def _page_text(page_num: int) -> str:
+        # "blocks" skips the full layout pass of plain get_text(); block
+        # type 0 keeps text blocks and drops image blocks
+        return "\n".join(block[4] for block in doc[page_num].get_text("blocks")
+                         if block[6] == 0)
+
+    # Pages are extracted sequentially on purpose: PyMuPDF is not
+    # thread-safe for concurrent access to one Document. Parallelism
+    # comes from the process pool mapping this worker across PDFs.
+    page_texts = [_page_text(page_num) for page_num in range(doc.page_count)]
+
+    # One split_documents call over all pages reuses the splitter's
+    # compiled separators and carries page metadata through for free,
+    # instead of per-page split_text plus a dict-building loop
+    pages = [
+        Document(
+            page_content=text,
+            metadata={"source": pdf_path, "page": page_num + 1}
+        )
+        for page_num, text in enumerate(page_texts)
+    ]
+
+    return [{"content": chunk.page_content, "metadata": chunk.metadata}
+            for chunk in splitter.split_documents(pages)]
+
+
 class RAGAgent:
-    def __init__(self, model_name: str = "gpt-3.5-turbo", vector_store_path: str = "data/vector_store"):
+    # Below this many chunks an exact flat index is both faster and more
+    # accurate; above it, an IVF+PQ index keeps search sub-linear and
+    # shrinks each stored vector to a few bytes
+    IVF_MIN_VECTORS = 4096
+
+    def __init__(self, model_name: str = "gpt-3.5-turbo", vector_store_path: str = "data/vector_store",
+                 ivf_nprobe: int = 8):
         self.model_name = model_name
         self.vector_store_path = vector_store_path
-        self.embeddings = OpenAIEmbeddings()
+        self.ivf_nprobe = ivf_nprobe
+
+        # Embeddings are a pure function of (model, text), so cache them on
+        # disk - repeat queries and re-ingests skip the API call entirely
+        # and the cache survives restarts
+        underlying_embeddings = OpenAIEmbeddings()
+        self.embeddings = CacheBackedEmbeddings.from_bytes_store(
+            underlying_embeddings,
+            LocalFileStore("data/emb_cache"),
+            namespace=underlying_embeddings.model,
+            query_embedding_cache=True
+        )
         self.llm = ChatOpenAI(model_name=model_name, temperature=0.7)
         
-        self.memory = ConversationBufferMemory(
+        # Windowed memory keeps the last few turns only, so long-running
+        # sessions stay constant in RAM and prompt-token cost
+        self.memory = ConversationBufferWindowMemory(
+            k=6,
             memory_key="chat_history",
             return_messages=True,
             output_key="answer"
         )
         
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
             length_function=len,
         )
         
@@ -50,63 +153,105 @@ class RAGAgent:
         )
         
         self.vector_store = None
+        self.retriever = None
         self.qa_chain = None
-        
+        # Guard so the on-disk index is deserialized at most once per
+        # process - a failed load is not retried on every query either
+        self._vs_loaded = False
+        # Serializes concurrent store mutations (add_texts + save_local)
+        self._store_lock = threading.Lock()
+
         self._load_vector_store()
 
     def process_pdf(self, pdf_path: str) -> List[Dict]:
         """Process PDF document and return chunks with metadata"""
-        doc = fitz.open(pdf_path)
-        chunks = []
-        
-        for page_num in range(doc.page_count):
-            page = doc[page_num]
-            text = page.get_text()
-            
-            # Split text into chunks
-            texts = self.text_splitter.split_text(text)
-            
-            # Create chunks with metadata
-            for chunk in texts:
-                chunks.append({
-                    "content": chunk,
-                    "metadata": {
-                        "source": pdf_path,
-                        "page": page_num + 1
-                    }
-                })
-        
-        return chunks
+        return _process_pdf_file(pdf_path)
+
+    def _embed_in_batches(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in fixed-size batches rather than one giant request
+
+        Returns a float32 matrix - the API hands back Python floats
+        (float64), which would double the index's RAM and halve BLAS
+        throughput if stored as-is.
+        """
+        vectors = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            vectors.extend(
+                self.embeddings.embed_documents(texts[start:start + EMBED_BATCH_SIZE])
+            )
+        return np.asarray(vectors, dtype=np.float32)
 
     def _load_vector_store(self):
-        """Load or create vector store from JSON FAQs"""
+        """Load the persisted vector store from disk, at most once"""
+        if self._vs_loaded:
+            return
+        self._vs_loaded = True
         try:
-            # First try to load existing vector store
             vector_store_path = Path(self.vector_store_path)
             if vector_store_path.exists():
                 self.vector_store = FAISS.load_local(
-                    str(vector_store_path), 
+                    str(vector_store_path),
                     self.embeddings,
                     allow_dangerous_deserialization=True
                 )
+                self._restore_distance_strategy()
+                self._maybe_move_index_to_gpu()
                 self._initialize_qa_chain()
                 print("Successfully loaded existing vector store")
-            else:
-                # Initialize from JSON if vector store doesn't exist
-                self.initialize_vector_store()
         except Exception as e:
             print(f"Error loading vector store: {str(e)}")
             self.vector_store = None
 
+    def _restore_distance_strategy(self):
+        """Re-derive the distance strategy from the deserialized index
+
+        save_local persists only the faiss index and the docstore -
+        distance_strategy and normalize_L2 are constructor-only, so a
+        reloaded inner-product store would otherwise default to
+        EUCLIDEAN_DISTANCE and _score_to_cosine would mangle its scores.
+        The index's own metric type is authoritative for both old L2
+        stores and the inner-product ones built here.
+        """
+        import faiss
+
+        if self.vector_store.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            self.vector_store.distance_strategy = DistanceStrategy.MAX_INNER_PRODUCT
+            self.vector_store._normalize_L2 = True
+
+    def _maybe_move_index_to_gpu(self):
+        """Move the FAISS index to GPU when CUDA and faiss-gpu are available
+
+        Flat/IVF search is memory-bandwidth bound, so a GPU-resident index
+        searches several times faster once the knowledge base grows. Any
+        failure leaves the CPU index in place.
+        """
+        try:
+            import torch
+            if not torch.cuda.is_available():
+                return
+            import faiss
+            if not hasattr(faiss, 'StandardGpuResources'):
+                return
+            resources = faiss.StandardGpuResources()
+            self.vector_store.index = faiss.index_cpu_to_gpu(
+                resources, 0, self.vector_store.index
+            )
+            # Keep the resources object alive alongside the index
+            self._gpu_resources = resources
+            print("Moved FAISS index to GPU")
+        except Exception as e:
+            print(f"Keeping FAISS index on CPU: {str(e)}")
+
     def _initialize_qa_chain(self):
         """Initialize the QA chain with the vector store"""
         try:
+            self.retriever = self.vector_store.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": 3}
+            )
             self.qa_chain = ConversationalRetrievalChain.from_llm(
                 llm=self.llm,
-                retriever=self.vector_store.as_retriever(
-                    search_type="similarity",
-                    search_kwargs={"k": 3}
-                ),
+                retriever=self.retriever,
                 memory=self.memory,
                 return_source_documents=True,
                 combine_docs_chain_kwargs={"prompt": self.qa_prompt}
@@ -116,26 +261,85 @@ class RAGAgent:
             print(f"Error initializing QA chain: {str(e)}")
             self.qa_chain = None
 
+    def _refresh_qa_chain(self):
+        """Point the live chain at the current store instead of rebuilding
+
+        The retriever is stateless apart from its vector store reference,
+        so after a store swap it is enough to repoint that reference; the
+        chain itself is built exactly once and stays hot.
+        """
+        if self.qa_chain is not None and self.retriever is not None:
+            self.retriever.vectorstore = self.vector_store
+        else:
+            self._initialize_qa_chain()
+
     def initialize_vector_store(self, pdf_paths: List[str]) -> None:
         """Initialize FAISS vector store from PDF documents"""
-        all_chunks = []
-        for pdf_path in pdf_paths:
-            chunks = self.process_pdf(pdf_path)
-            all_chunks.extend(chunks)
-        
+        # Extract and chunk the PDFs in parallel worker processes
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            all_chunks = list(itertools.chain.from_iterable(
+                executor.map(_process_pdf_file, pdf_paths)
+            ))
+
         texts = [chunk["content"] for chunk in all_chunks]
         metadatas = [chunk["metadata"] for chunk in all_chunks]
-        
-        self.vector_store = FAISS.from_texts(
-            texts, 
-            self.embeddings,
-            metadatas=metadatas
-        )
-        
+
+        if len(texts) >= self.IVF_MIN_VECTORS:
+            self.vector_store = self._build_ivfpq_store(texts, metadatas)
+        else:
+            # Embed in batches, then build the index once from the prepared
+            # (text, vector) pairs. Inner product over normalized vectors
+            # makes search scores cosine similarities, so the confidence
+            # path can reuse them directly
+            vectors = self._embed_in_batches(texts)
+            self.vector_store = FAISS.from_embeddings(
+                list(zip(texts, vectors)),
+                self.embeddings,
+                metadatas=metadatas,
+                normalize_L2=True,
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+
         os.makedirs(self.vector_store_path, exist_ok=True)
+        # Persist before any GPU transfer - a GPU-resident index cannot be
+        # serialized directly
         self.vector_store.save_local(self.vector_store_path)
-        
-        self._initialize_qa_chain()
+        self._vs_loaded = True
+        self._maybe_move_index_to_gpu()
+
+        self._refresh_qa_chain()
+
+    def _build_ivfpq_store(self, texts: List[str], metadatas: List[Dict]):
+        """Build an IVF+PQ FAISS store for large knowledge bases
+
+        The inverted lists keep search sub-linear in the number of chunks
+        and product quantization stores each vector in 8 bytes instead of
+        d*4. Recall is tuned via nprobe.
+        """
+        import faiss
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+
+        vectors = self._embed_in_batches(texts)
+        faiss.normalize_L2(vectors)
+
+        index = faiss.index_factory(vectors.shape[1], "IVF100,PQ8",
+                                    faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.add(vectors)
+        index.nprobe = self.ivf_nprobe
+
+        documents = [Document(page_content=text, metadata=metadata)
+                     for text, metadata in zip(texts, metadatas)]
+        docstore = InMemoryDocstore({str(i): doc for i, doc in enumerate(documents)})
+
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id={i: str(i) for i in range(len(documents))},
+            normalize_L2=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
 
     def update_vector_store(self, new_pdf_paths: List[str]) -> None:
         """Add new PDF documents to existing vector store"""
@@ -149,154 +353,159 @@ class RAGAgent:
         
         if self.vector_store is None:
             self._load_vector_store()
-        
+
         if self.vector_store:
-            self.vector_store.add_texts(texts, metadatas=metadatas)
-            self.vector_store.save_local(self.vector_store_path)
+            # In-place append - the live retriever keeps its reference, so
+            # the chain needs no rebuild at all
+            with self._store_lock:
+                self.vector_store.add_texts(texts, metadatas=metadatas)
+                self.vector_store.save_local(self.vector_store_path)
         else:
-            self.vector_store = FAISS.from_texts(texts, self.embeddings, metadatas=metadatas)
-            self.vector_store.save_local(self.vector_store_path)
-        
-        self._initialize_qa_chain()    
-
-    def _load_vector_store(self):
-        try:
-            if os.path.exists(self.vector_store_path):
-                self.vector_store = FAISS.load_local(
-                    self.vector_store_path, 
+            with self._store_lock:
+                self.vector_store = FAISS.from_texts(
+                    texts,
                     self.embeddings,
-                    allow_dangerous_deserialization=True
+                    metadatas=metadatas,
+                    normalize_L2=True,
+                    distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
                 )
-                self._initialize_qa_chain()
-        except Exception as e:
-            print(f"Error loading vector store: {str(e)}")
-            self.vector_store = None    
+                self.vector_store.save_local(self.vector_store_path)
+            self._refresh_qa_chain()
 
     def _is_domain_relevant(self, query: str) -> bool:
         """Check if query is relevant to Aadhaar domain"""
-        domain_keywords = [
-            'aadhaar', 'aadhar', 'uid', 'uidai', 'biometric', 'enrollment', 'enrolment',
-            'demographic', 'authentication', 'ekyc', 'kyc', 'resident', 'virtual id',
-            'update', 'correction', 'verification', 'identity', 'card', 'number',
-            'unique identification', 'address', 'mobile', 'email', 'fingerprint', 'iris',
-            'face', 'photo', 'otp', 'masked', 'mandatory', 'optional', 'register'
-        ]
-        
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in domain_keywords)
+        # Delegate to the shared DomainChecker, which scans all keywords in
+        # a single automaton/regex pass instead of a per-keyword loop
+        is_relevant, _ = self.domain_checker.is_domain_relevant(query)
+        return is_relevant
+
+    def _score_to_cosine(self, score: float) -> float:
+        """Convert a FAISS search score into a cosine similarity
+
+        OpenAI embeddings are unit-norm, so inner-product scores already
+        are cosines; for older L2 stores the squared distance satisfies
+        d2 = 2 - 2*cos.
+        """
+        strategy = getattr(self.vector_store, 'distance_strategy', None)
+        if strategy == DistanceStrategy.MAX_INNER_PRODUCT:
+            return score
+        return 1.0 - score / 2.0
+
+    def _calculate_confidence(self, query: str, source_documents) -> ConfidenceResult:
+        response = ConfidenceResult(has_sources=bool(source_documents))
+
+        # Cheapest filter first - off-domain queries bail before any
+        # search or scoring work is even set up
+        response.domain_relevant = self._is_domain_relevant(query)
+
+        if not response.domain_relevant:
+            return response
+
+        exact_match = self._find_exact_faq_match(query)
+        if exact_match['confidence'] > 0.0:
+            response.confidence = exact_match['confidence']
+            response.exact_match = True
+            response.semantic_match = 1.0
+            return response
 
-    def _calculate_confidence(self, query: str, source_documents) -> Dict:
+        if not source_documents:
+            response.confidence = 0.2
+            response.debug_info = {"reason": "no_sources"}
+            return response
+
+        # Reuse the vectors already stored in FAISS: one similarity
+        # search returns cosine scores against the stored embeddings,
+        # so no document is ever re-embedded through the API. Only this
+        # call leaves the process, so only it gets an exception handler -
+        # the pure-Python scoring below runs unguarded
         try:
-            response = {
-                "confidence": 0.0,
-                "domain_relevant": False,
-                "has_sources": bool(source_documents),
-                "exact_match": False,
-                "semantic_match": 0.0,
-                "debug_info": {}
-            }
-            
-            response["domain_relevant"] = self._is_domain_relevant(query)
-            
-            if not response["domain_relevant"]:
-                return response
-            
-            exact_match = self._find_exact_faq_match(query)
-            if exact_match['confidence'] > 0.0:
-                response.update({
-                    "confidence": exact_match['confidence'],
-                    "exact_match": True,
-                    "semantic_match": 1.0
-                })
-                return response
-            
-            if not source_documents:
-                response.update({
-                    "confidence": 0.2,
-                    "semantic_match": 0.0,
-                    "debug_info": {"reason": "no_sources"}
-                })
-                return response
-                
-            query_embedding = self.embeddings.embed_query(query)
-            similarities = []
-            matched_texts = []
-            
-            for doc in source_documents:
-                doc_text = doc.page_content
-                if "Q:" in doc_text and "A:" in doc_text:
-                    question_part = doc_text.split("A:")[0].replace("Q:", "").strip()
-                else:
-                    question_part = doc_text
-
-                # Check for key terms matching
-                query_terms = set(query.lower().split())
-                doc_terms = set(question_part.lower().split())
-                term_overlap = len(query_terms.intersection(doc_terms)) / len(query_terms)
-
-                doc_embedding = self.embeddings.embed_query(question_part)
-                similarity = float(cosine_similarity(
-                    np.array(query_embedding).reshape(1, -1),
-                    np.array(doc_embedding).reshape(1, -1)
-                )[0][0])
-                
-                # Adjust similarity based on term overlap
-                adjusted_similarity = similarity * (0.7 + 0.3 * term_overlap)
-                
-                similarities.append(adjusted_similarity)
+            scored_docs = self.vector_store.similarity_search_with_score(
+                query, k=max(len(source_documents), 1)
+            )
+        except (openai.RateLimitError, openai.APIError, RuntimeError) as e:
+            print(f"Error in confidence calculation: {str(e)}")
+            response.debug_info = {"error": str(e)}
+            return response
+
+        return self._score_sources(query, source_documents, scored_docs, response)
+
+    def _score_sources(self, query: str, source_documents, scored_docs,
+                       response: ConfidenceResult) -> ConfidenceResult:
+        """Pure scoring over already-fetched search results"""
+        question_parts = []
+        cosine_sims = []
+        for doc, score in scored_docs:
+            doc_text = doc.page_content
+            if "Q:" in doc_text and "A:" in doc_text:
+                question_part = doc_text.split("A:")[0].replace("Q:", "").strip()
+            else:
+                question_part = doc_text
+            question_parts.append(question_part)
+            cosine_sims.append(self._score_to_cosine(float(score)))
+
+        # Preallocated float32 scores instead of a growing Python list;
+        # per-match debug dicts are only assembled under RAG_DEBUG
+        similarities = np.empty(len(question_parts), dtype=np.float32)
+        matched_texts = [] if DEBUG else None
+
+        # Hoisted out of the loop: the query tokens never change, and
+        # each doc's term set collapses to a 64-bit bitmap so overlap
+        # is one AND + popcount instead of building sets per doc
+        query_terms = set(query.lower().split())
+        query_bitmap = _tokens_to_bitmap(query_terms)
+        query_term_count = max(1, len(query_terms))
+
+        for idx, (question_part, similarity) in enumerate(zip(question_parts, cosine_sims)):
+            # Check for key terms matching
+            doc_bitmap = _tokens_to_bitmap(question_part.lower().split())
+            term_overlap = (query_bitmap & doc_bitmap).bit_count() / query_term_count
+
+            # Adjust similarity based on term overlap
+            adjusted_similarity = float(similarity) * (0.7 + 0.3 * term_overlap)
+
+            similarities[idx] = adjusted_similarity
+            if DEBUG:
                 matched_texts.append({
                     "text": question_part[:100] + "...",
                     "similarity": adjusted_similarity,
                     "term_overlap": term_overlap
                 })
 
-            max_similarity = max(similarities) if similarities else 0.0
-            response["semantic_match"] = max_similarity
-            
-            # More stringent confidence calculation
-            if max_similarity >= 0.95:
-                confidence = 0.95
-            elif max_similarity >= 0.90:
-                confidence = 0.85
-            elif max_similarity >= 0.80:
-                confidence = 0.5  # Significantly reduced for partial matches
-            else:
-                confidence = 0.2  # Force low confidence for poor matches
-            
-            # Check for mandatory/optional specific terms
-            if 'mandatory' in query.lower() or 'compulsory' in query.lower():
-                matched_mandatory = any('mandatory' in doc.page_content.lower() or 
-                                    'compulsory' in doc.page_content.lower() 
-                                    for doc in source_documents)
-                if not matched_mandatory:
-                    confidence *= 0.5  # Reduce confidence if specific terms not found
-            
-            relevant_sources = len([s for s in similarities if s > 0.8])  # Increased threshold
-            if relevant_sources == 0:
-                confidence *= 0.5
-            
-            response.update({
-                "confidence": confidence,
-                "debug_info": {
-                    "max_similarity": max_similarity,
-                    "relevant_sources": relevant_sources,
-                    "final_confidence": confidence,
-                    "matched_texts": matched_texts
-                }
-            })
-            
-            return response
+        max_similarity = float(similarities.max()) if len(similarities) else 0.0
+        response.semantic_match = max_similarity
 
-        except Exception as e:
-            print(f"Error in confidence calculation: {str(e)}")
-            return {
-                "confidence": 0.0,
-                "domain_relevant": False,
-                "has_sources": False,
-                "exact_match": False,
-                "semantic_match": 0.0,
-                "debug_info": {"error": str(e)}
-            }
+        # More stringent confidence calculation
+        if max_similarity >= 0.95:
+            confidence = 0.95
+        elif max_similarity >= 0.90:
+            confidence = 0.85
+        elif max_similarity >= 0.80:
+            confidence = 0.5  # Significantly reduced for partial matches
+        else:
+            confidence = 0.2  # Force low confidence for poor matches
+
+        # Check for mandatory/optional specific terms
+        if 'mandatory' in query.lower() or 'compulsory' in query.lower():
+            matched_mandatory = any('mandatory' in doc.page_content.lower() or
+                                'compulsory' in doc.page_content.lower()
+                                for doc in source_documents)
+            if not matched_mandatory:
+                confidence *= 0.5  # Reduce confidence if specific terms not found
+
+        relevant_sources = int((similarities > 0.8).sum())  # Increased threshold
+        if relevant_sources == 0:
+            confidence *= 0.5
+
+        response.confidence = confidence
+        response.debug_info = {
+            "max_similarity": max_similarity,
+            "relevant_sources": relevant_sources,
+            "final_confidence": confidence
+        }
+        if DEBUG:
+            response.debug_info["matched_texts"] = matched_texts
+
+        return response
 
     def process_query(self, query: str) -> Dict:
         try:
@@ -309,10 +518,10 @@ class RAGAgent:
                     "sources": []
                 }
 
+            # The store was loaded (or the attempt failed) once in __init__;
+            # don't pay a reload of the index on every query
             if not self.qa_chain:
-                self._load_vector_store()
-                if not self.qa_chain:
-                    raise ValueError("QA chain not initialized.")
+                raise ValueError("QA chain not initialized.")
             
             print(f"\nRAG Processing:")
             print(f"Query: {query}")
@@ -343,12 +552,12 @@ class RAGAgent:
             return {
                 "answer": result["answer"],
                 "sources": [f"Source: {doc.metadata.get('source')}, Page: {doc.metadata.get('page')}" for doc in source_docs],
-                "confidence": confidence_info["confidence"],
-                "domain_relevant": confidence_info["domain_relevant"],
-                "has_sources": confidence_info["has_sources"],
-                "exact_match": confidence_info["exact_match"],
-                "semantic_match": confidence_info["semantic_match"],
-                "debug_info": confidence_info.get("debug_info", {})
+                "confidence": confidence_info.confidence,
+                "domain_relevant": confidence_info.domain_relevant,
+                "has_sources": confidence_info.has_sources,
+                "exact_match": confidence_info.exact_match,
+                "semantic_match": confidence_info.semantic_match,
+                "debug_info": confidence_info.debug_info
             }
          
         except Exception as e:
@@ -357,25 +566,29 @@ class RAGAgent:
     
     def _find_exact_faq_match(self, query: str) -> Dict:
         """Find exact match in vector store"""
-        try:
-            if not self.vector_store:
-                return {"confidence": 0.0, "match": None}
+        # Explicit guard instead of letting an AttributeError unwind
+        if not self.vector_store:
+            return {"confidence": 0.0, "match": None}
 
+        try:
             results = self.vector_store.similarity_search_with_score(query, k=1)
-            if results:
-                doc, score = results[0]
-                exact_match_threshold = 0.95
-                if score >= exact_match_threshold:
-                    return {"confidence": 1.0, "match": doc}
-                elif score >= 0.8:
-                    return {"confidence": 0.9, "match": doc}
-            
-            return {"confidence": 0.0, "match": None}
-            
-        except Exception as e:
+        except (openai.RateLimitError, openai.APIError, RuntimeError) as e:
             print(f"Error in exact match: {str(e)}")
             return {"confidence": 0.0, "match": None}
 
+        if results:
+            doc, score = results[0]
+            # Normalize to a cosine similarity first - on a legacy L2
+            # store the raw score is a distance where lower is better
+            similarity = self._score_to_cosine(float(score))
+            exact_match_threshold = 0.95
+            if similarity >= exact_match_threshold:
+                return {"confidence": 1.0, "match": doc}
+            elif similarity >= 0.8:
+                return {"confidence": 0.9, "match": doc}
+
+        return {"confidence": 0.0, "match": None}
+
     def clear_memory(self):
         """Clear conversation memory"""
         self.memory.clear()
\ No newline at end of file
@@ -1,13 +1,12 @@
+import asyncio
 import gradio as gr
+import io
 import sys
 import os
 import traceback
-import tempfile
-import shutil
 import numpy as np
 from typing import Dict, List, Union, Any
 from pathlib import Path
-import scipy.io.wavfile
 
 # Add project root to Python path
 project_root = Path(__file__).resolve().parent.parent
@@ -38,32 +37,26 @@ class AadhaarChatInterface:
                 # Handle audio input (both upload and recording)
                 if isinstance(audio_data, tuple):
                     audio_samples, sampling_rate = audio_data
-                    
-                    # Create a temporary WAV file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-                        temp_path = temp_file.name
 
-                    # Convert and save audio data using scipy
-                    try:
-                        import scipy.io.wavfile as wav
-                        if isinstance(audio_samples, np.ndarray):
-                            # Ensure the data is in the right format
-                            audio_samples = (audio_samples * 32767).astype(np.int16)
-                            wav.write(temp_path, sampling_rate, audio_samples)
-                        elif isinstance(audio_samples, str) and os.path.exists(audio_samples):
-                            # Copy existing file
-                            shutil.copy2(audio_samples, temp_path)
-                        
-                        # Process audio with temporary file
-                        response = self.manager_agent.process_multilingual_query(
-                            audio_data=temp_path,
-                            source_language=source_language,
-                            target_language=target_language
-                        )
-                    finally:
-                        # Clean up temporary file
-                        if os.path.exists(temp_path):
-                            os.unlink(temp_path)
+                    if isinstance(audio_samples, np.ndarray):
+                        import soundfile as sf
+                        # Encode straight to an in-memory WAV - soundfile
+                        # does the float->int16 conversion in one C pass,
+                        # and no temp file ever touches disk
+                        buffer = io.BytesIO()
+                        sf.write(buffer, audio_samples, sampling_rate,
+                                 format='WAV', subtype='PCM_16')
+                        buffer.seek(0)
+                        audio_input = buffer
+                    else:
+                        # Already a file on disk - pass the path through
+                        audio_input = audio_samples
+
+                    response = self.manager_agent.process_multilingual_query(
+                        audio_data=audio_input,
+                        source_language=source_language,
+                        target_language=target_language
+                    )
                 else:
                     response = self.manager_agent.process_multilingual_query(
                         audio_data=audio_data,
@@ -123,18 +116,23 @@ class AadhaarChatInterface:
             return self.process_query(None, audio_input, source_lang, target_lang, history)
         return history
     
-    def process_with_audio(self, message, audio_path, src_lang, tgt_lang, history, enable_voice):
+    async def process_with_audio(self, message, audio_path, src_lang, tgt_lang, history, enable_voice):
+        # Async so gradio can keep many requests in flight - the blocking
+        # agent calls run on worker threads via asyncio.to_thread, leaving
+        # the event loop free while OpenAI/Google round trips are pending
         try:
             # Process query
             if audio_path:
-                response = self.manager_agent.process_multilingual_query(
+                response = await asyncio.to_thread(
+                    self.manager_agent.process_multilingual_query,
                     audio_data=audio_path,
                     source_language=src_lang,
                     target_language=tgt_lang
                 )
                 query = response.get("original_text", "")
             else:
-                response = self.manager_agent.process_multilingual_query(
+                response = await asyncio.to_thread(
+                    self.manager_agent.process_multilingual_query,
                     query=message,
                     source_language=src_lang,
                     target_language=tgt_lang
@@ -147,7 +145,8 @@ class AadhaarChatInterface:
             # Generate audio if enabled
             audio_path = None
             if enable_voice:
-                audio_result = self.manager_agent.google_audio_agent.text_to_speech(
+                audio_result = await asyncio.to_thread(
+                    self.manager_agent.google_audio_agent.text_to_speech,
                     response["answer"],
                     tgt_lang
                 )
@@ -254,11 +253,14 @@ class AadhaarChatInterface:
 def main():
     chat_app = AadhaarChatInterface()
     interface = chat_app.create_interface()
+    # Queue requests instead of capping worker threads - handlers are
+    # async, so in-flight concurrency is bounded by the limit below and
+    # by upstream API rate limits rather than a thread count
+    interface.queue(default_concurrency_limit=16, max_size=64)
     interface.launch(
         server_name="0.0.0.0",
         server_port=7860,
-        share=True,
-        max_threads=4
+        share=True
     )
 
 if __name__ == "__main__":
@@ -1,44 +1,136 @@
+import re
+import threading
+from collections import OrderedDict
+
+try:
+    import ahocorasick
+except ImportError:
+    # Optional - the compiled regex scan is used when unavailable
+    ahocorasick = None
+
+# Base keyword set, lowercase for case-insensitive matching
+_BASE_KEYWORDS = {
+    'aadhaar', 'aadhar', 'adhar', 'uid', 'uidai', 'biometric', 'enrollment', 'enrolment',
+    'demographic', 'authentication', 'ekyc', 'kyc', 'resident', 'virtual id', 'identity',
+    'card', 'number', 'unique identification', 'address', 'mobile', 'email', 'fingerprint',
+    'iris', 'face', 'photo', 'otp', 'masked', 'mandatory', 'optional', 'register',
+    'enrollment center', 'aadhaar card', 'demographic', 'biometric', 'bank linking',
+    'pan linking', 'mobile number', 'email', 'update', 'correction', 'आधार', 'अदहार'  # Add more transliterated versions
+}
+
+# Everything derived from the keyword set is built once at import time,
+# not per DomainChecker instance - checkers are created per agent, and
+# module-level constants are also shared copy-on-write across forked
+# workers instead of duplicated per process
+
+# Expanded with the parts of multi-word terms, frozen for O(1) membership
+DOMAIN_KEYWORDS = frozenset(
+    _BASE_KEYWORDS | {word for keyword in _BASE_KEYWORDS for word in keyword.split()}
+)
+
+# Every keyword prefix of three or more characters, so the
+# partial-match fallback is one set probe per query word instead of
+# a scan over the whole keyword list; the length floor keeps
+# stopword-sized fragments from matching
+_KEYWORD_PREFIXES = frozenset(
+    keyword[:i]
+    for keyword in DOMAIN_KEYWORDS
+    for i in range(3, len(keyword) + 1)
+)
+
+# Compiled keyword alternations - a single regex scan over the query
+# replaces per-keyword Python `in` loops. Longest alternatives first so
+# multi-word terms win over their parts.
+_DIRECT_RE = re.compile('aadhaar|aadhar|adhar|uidai|uid')
+_KEYWORD_RE = re.compile('|'.join(
+    sorted((re.escape(kw) for kw in DOMAIN_KEYWORDS),
+           key=len, reverse=True)
+))
+
+
+def _build_automaton():
+    """Build the Aho-Corasick keyword automaton, or None if unavailable"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in DOMAIN_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+# Matches all keywords in one O(len(query)) pass when the pyahocorasick
+# extension is installed
+_KEYWORD_AUTOMATON = _build_automaton()
+
+
 class DomainChecker:
+    # Maximum number of memoized relevance results
+    RESULT_CACHE_SIZE = 1024
+
     def __init__(self):
-        # Convert all keywords to lowercase for case-insensitive matching
-        self.domain_keywords = {
-            'aadhaar', 'aadhar', 'adhar', 'uid', 'uidai', 'biometric', 'enrollment', 'enrolment',
-            'demographic', 'authentication', 'ekyc', 'kyc', 'resident', 'virtual id', 'identity',
-            'card', 'number', 'unique identification', 'address', 'mobile', 'email', 'fingerprint',
-            'iris', 'face', 'photo', 'otp', 'masked', 'mandatory', 'optional', 'register',
-            'enrollment center', 'aadhaar card', 'demographic', 'biometric', 'bank linking',
-            'pan linking', 'mobile number', 'email', 'update', 'correction', 'आधार', 'अदहार'  # Add more transliterated versions
-        }
-        # Add variations of keywords
-        additional_keywords = set()
-        for keyword in self.domain_keywords:
-            # Add keyword parts if it's a multi-word term
-            additional_keywords.update(keyword.split())
-        self.domain_keywords.update(additional_keywords)
+        # The matching structures are module-level constants; only the
+        # per-instance result cache is built here
+        self.domain_keywords = DOMAIN_KEYWORDS
+        self._keyword_prefixes = _KEYWORD_PREFIXES
+        self._direct_re = _DIRECT_RE
+        self._keyword_re = _KEYWORD_RE
+        self._keyword_automaton = _KEYWORD_AUTOMATON
+
+        # LRU of normalized query -> (is_relevant, score), locked so
+        # concurrent requests can't race the lookup/evict sequences
+        self._result_cache = OrderedDict()
+        self._result_lock = threading.Lock()
 
     def is_domain_relevant(self, query: str) -> tuple[bool, float]:
         """
         Check if query is related to Aadhaar domain
         Returns: (is_relevant, relevance_score)
         """
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
+        # The result is a pure function of the query, and users retry the
+        # same questions constantly - memoize with a bounded LRU
+        cache_key = query.strip().lower()
+        with self._result_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                return cached
+
+        result = self._check_relevance(cache_key)
+        with self._result_lock:
+            self._result_cache[cache_key] = result
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+
+    def _check_relevance(self, query_lower: str) -> tuple[bool, float]:
+        """Uncached relevance check on an already-lowercased query"""
 
         # Direct checks for common variations
-        if any(term in query_lower for term in ['aadhaar', 'aadhar', 'adhar', 'uid', 'uidai']):
+        if self._direct_re.search(query_lower):
             return True, 1.0
 
+        query_words = set(query_lower.split())
+
         # Word-based matching
         matching_keywords = query_words.intersection(self.domain_keywords)
-        
+
         # If any matches found
         if matching_keywords:
             relevance_score = min(1.0, len(matching_keywords) / len(query_words) + 0.3)  # Added base score
             return True, relevance_score
-            
-        # Check for partial matches
+
+        # Check for partial matches - one automaton/regex scan finds any
+        # keyword embedded in the query; the loop only covers query words
+        # that are themselves fragments of a keyword
+        if self._keyword_automaton is not None:
+            if next(self._keyword_automaton.iter(query_lower), None) is not None:
+                return True, 0.7
+        elif self._keyword_re.search(query_lower):
+            return True, 0.7
+
         for word in query_words:
-            if any(keyword in word or word in keyword for keyword in self.domain_keywords):
+            if word in self._keyword_prefixes:
                 return True, 0.7
 
-        return False, 0.0
\ No newline at end of file
+        return False, 0.0